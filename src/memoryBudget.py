@@ -0,0 +1,131 @@
+import io
+import struct
+import sys
+import typing
+import zlib
+
+try:
+    import resource
+except ImportError: # not available on Windows
+    resource = None
+
+# rows drawn above and below every strip and then thrown away, antialiased
+# edges that spill over a strip's border would otherwise be clipped off
+STRIP_OVERLAP = 2
+
+# the share of the budget the rasteriser's pixel buffer may take up,
+# the rest is left for the databases, the artists and the interpreter
+RASTER_SHARE = 0.25
+
+def peakRSS() -> int:
+    """The most memory this process has held at once so far
+
+    :return: The peak resident set size in bytes, or 0 where it can't be measured
+    :rtype: int
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class MemoryBudget:
+    """A limit on the memory used while rendering, and a record of the memory used
+
+    Passing one to ``timelineCharts.renderFigure`` or ``timelineCharts.renderToFile``
+    makes them free the description's data once the databases are built,
+    free every database once its chart is drawn, and rasterise figures whose
+    pixel buffer would be too big for the budget in horizontal strips.
+
+    :cvar int limit: The budget in bytes
+    :cvar list stages: The name and peak resident set size, in bytes, after each stage
+    """
+    def __init__(self, megabytes: float, report: typing.TextIO = sys.stderr):
+        self.limit = int(megabytes * 1024 * 1024)
+        self.report = report
+        self.stages = [ ]
+
+    def stage(self, name: str):
+        """Record the peak memory use after a stage of the pipeline
+
+        The peak is for the whole process so far, so the report also shows
+        how much it grew during the stage.
+
+        :param name: The name of the stage that just finished
+        :type name: str
+        """
+        peak = peakRSS()
+        growth = peak - self.stages[-1][1] if len(self.stages) > 0 else peak
+        self.stages.append((name, peak))
+        if self.report is not None:
+            print(f"{name}: peak RSS {peak / 2**20:.1f} MB (+{growth / 2**20:.1f} MB)", file=self.report)
+
+    def rasterBytes(self) -> int:
+        """How big the rasteriser's pixel buffer may get
+
+        :return: A size in bytes
+        :rtype: int
+        """
+        return int(self.limit * RASTER_SHARE)
+
+def writePNGInStrips(figure, outputPath: str, maxBufferBytes: int, dpi: float = None):
+    """Rasterise a figure to a PNG file a horizontal strip at a time
+
+    Each strip is drawn by Agg on its own, so the pixel buffer never holds
+    more than ``maxBufferBytes`` (or a few rows, for very small budgets), and
+    the compressed rows are written to the file straight away. Every strip
+    redraws the whole figure, so this trades time for memory.
+
+    :param figure: The figure to rasterise
+    :type figure: matplotlib.figure.Figure
+    :param outputPath: Where to write the PNG
+    :type outputPath: str
+    :param maxBufferBytes: The most a single strip's RGBA buffer may take
+    :type maxBufferBytes: int
+    :param dpi: The resolution, defaults to the figure's
+    :type dpi: float
+    """
+    from matplotlib.transforms import Bbox
+
+    if dpi is None:
+        dpi = figure.dpi
+    widthInches, heightInches = figure.get_size_inches()
+    width = int(round(widthInches * dpi))
+    height = int(round(heightInches * dpi))
+    stripRows = max(1, maxBufferBytes // (4 * width) - 2 * STRIP_OVERLAP)
+
+    def chunk(out, kind: bytes, data: bytes):
+        out.write(struct.pack('>I', len(data)))
+        out.write(kind)
+        out.write(data)
+        out.write(struct.pack('>I', zlib.crc32(kind + data)))
+
+    with open(outputPath, 'wb') as out:
+        out.write(b'\x89PNG\r\n\x1a\n')
+        # 8 bit RGBA, no interlacing
+        chunk(out, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+
+        compressor = zlib.compressobj()
+        rowBytes = 4 * width
+        top = 0
+        while top < height:
+            rows = min(stripRows, height - top)
+            above = min(STRIP_OVERLAP, top)
+            below = min(STRIP_OVERLAP, height - top - rows)
+
+            # bbox_inches is measured from the bottom of the figure
+            strip = Bbox.from_extents(0, (height - top - rows - below) / dpi, width / dpi, (height - top + above) / dpi)
+            buffer = io.BytesIO()
+            figure.savefig(buffer, format='rgba', dpi=dpi, bbox_inches=strip, pad_inches=0)
+            pixels = buffer.getbuffer()
+
+            # every row is prefixed by its filter type, 0 for none
+            for row in range(above, above + rows):
+                data = compressor.compress(b'\x00' + pixels[row * rowBytes:(row + 1) * rowBytes])
+                if data:
+                    chunk(out, b'IDAT', data)
+            del pixels
+            top += rows
+
+        chunk(out, b'IDAT', compressor.flush())
+        chunk(out, b'IEND', b'')
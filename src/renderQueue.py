@@ -0,0 +1,264 @@
+import asyncio
+import json
+import os
+import sys
+import typing
+
+from validation import validateDescription
+
+# every job is rendered by running this script in its own process, so a job
+# that runs too long can be killed without taking a shared worker down with it
+TIMELINE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'timeline.py')
+
+class RenderJob:
+    """Simple struct for a chart description waiting to be rendered
+
+    :cvar int id: The identifier handed back by :meth:`RenderQueue.submit`
+    :cvar dict description: The chart description, as it would appear in a data file
+    :cvar str outputPath: Where the rendered chart will be written
+    :cvar float timeout: Seconds the job may run for, or None for no limit
+    """
+    def __init__(self, id: int, description: dict, outputPath: str, timeout: float = None):
+        self.id = id
+        self.description = description
+        self.outputPath = outputPath
+        self.timeout = timeout
+        self.cancelled = False
+
+class RenderResult:
+    """The outcome of a single render job
+
+    :cvar int jobId: The identifier of the job
+    :cvar str outputPath: Where the chart was (or would have been) written
+    :cvar str status: One of ``done``, ``failed``, ``invalid``, ``timeout`` or ``cancelled``
+    :cvar str error: The error output of a failed job, or the problems with an invalid description
+    """
+    def __init__(self, jobId: int, outputPath: str, status: str, error: str = None):
+        self.jobId = jobId
+        self.outputPath = outputPath
+        self.status = status
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"job {self.jobId} ({self.outputPath}): {self.status}"
+
+class RenderQueue:
+    """Renders chart descriptions concurrently, for use from asyncio code
+
+    At most ``workers`` charts are rendered at once, each in its own process.
+    At most ``maxPending`` jobs wait for a worker; once that many are
+    waiting, :meth:`submit` blocks until a worker picks one up. Results are
+    streamed back from :meth:`results` in the order the jobs finish.
+
+    Use it as an async context manager, closing it once every job has been
+    submitted::
+
+        async with RenderQueue(workers=4) as queue:
+            for description, outputPath in descriptions:
+                await queue.submit(description, outputPath, timeout=60)
+            await queue.close()
+            async for result in queue.results():
+                print(result)
+
+    Results can also be read from another task while jobs are still being
+    submitted.
+
+    :param workers: The number of charts rendered at the same time
+    :type workers: int
+    :param maxPending: The number of jobs that may wait for a worker
+    :type maxPending: int
+    """
+    def __init__(self, workers: int = None, maxPending: int = None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if maxPending is None:
+            maxPending = 2 * workers
+
+        self.workers = workers
+        self.maxPending = maxPending
+
+        self._pending = None
+        self._finished = None
+        self._workerTasks = [ ]
+        self._jobs = { }
+        self._running = { }
+        self._nextId = 0
+        self._closed = False
+        # submits still checking their description, close() waits for them
+        self._submitting = 0
+        self._submitsDone = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, excType, excValue, traceback):
+        if excType is not None:
+            for jobId in list(self._jobs):
+                self.cancel(jobId)
+        await self.close()
+
+    def start(self):
+        """Start the workers. Must be called from inside a running event loop"""
+        self._pending = asyncio.Queue(self.maxPending)
+        self._finished = asyncio.Queue()
+        self._submitsDone = asyncio.Event()
+        self._submitsDone.set()
+        self._workerTasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, description: dict, outputPath: str, timeout: float = None) -> int:
+        """Queue a chart description for rendering
+
+        Waits while the queue is full, so a fast producer is slowed down to
+        the rate the workers can keep up with. A description that fails
+        :func:`validation.validateDescription` is reported as ``invalid``
+        straight away, without taking up a worker.
+
+        :param description: The chart description
+        :type description: dict
+        :param outputPath: Where to write the chart. The format follows the extension
+        :type outputPath: str
+        :param timeout: Seconds the render may take before it is killed
+        :type timeout: float
+        :return: An identifier for the job, usable with :meth:`cancel`
+        :rtype: int
+        """
+        if self._closed:
+            raise RuntimeError("cannot submit to a closed RenderQueue")
+
+        job = RenderJob(self._nextId, description, outputPath, timeout)
+        self._nextId += 1
+
+        # registered before the first await, so that a close() in the
+        # meantime waits for this job rather than shutting the workers down
+        self._jobs[job.id] = job
+        self._submitting += 1
+        self._submitsDone.clear()
+        try:
+            # checking a big description takes seconds, which would stall every
+            # other job's progress if it ran on the event loop
+            errors = await asyncio.get_running_loop().run_in_executor(None, validateDescription, description)
+            if len(errors) > 0:
+                del self._jobs[job.id]
+                await self._finished.put(RenderResult(job.id, outputPath, 'invalid', '\n'.join(errors)))
+                return job.id
+
+            await self._pending.put(job)
+            return job.id
+        finally:
+            self._submitting -= 1
+            if self._submitting == 0:
+                self._submitsDone.set()
+
+    def cancel(self, jobId: int) -> bool:
+        """Cancel a job that is waiting or being rendered
+
+        A running job has its process killed. A cancelled job still produces
+        a result, with the status ``cancelled``.
+
+        :param jobId: The identifier returned by :meth:`submit`
+        :type jobId: int
+        :return: False if the job had already finished
+        :rtype: bool
+        """
+        if jobId not in self._jobs:
+            return False
+        self._jobs[jobId].cancelled = True
+        if jobId in self._running:
+            self._running[jobId].cancel()
+        return True
+
+    async def close(self):
+        """Stop accepting jobs and wait for every submitted job to finish"""
+        if self._closed:
+            return
+        self._closed = True
+
+        # jobs submitted before the close still have to be queued ahead of the sentinels
+        await self._submitsDone.wait()
+
+        # one sentinel per worker, each worker stops when it sees one
+        for _ in self._workerTasks:
+            await self._pending.put(None)
+        await asyncio.gather(*self._workerTasks)
+        await self._finished.put(None)
+
+    async def results(self) -> typing.AsyncIterator[RenderResult]:
+        """Yield each result as soon as its job finishes
+
+        Ends once the queue has been closed and every job has reported.
+
+        :return: The result of every job
+        :rtype: AsyncIterator[:class:`RenderResult`]
+        """
+        while True:
+            result = await self._finished.get()
+            if result is None:
+                # let any other reader see the end as well
+                await self._finished.put(None)
+                return
+            yield result
+
+    async def _worker(self):
+        while True:
+            job = await self._pending.get()
+            if job is None:
+                return
+
+            if job.cancelled:
+                result = RenderResult(job.id, job.outputPath, 'cancelled')
+            else:
+                # the render gets its own task so that cancel() can stop it
+                # without cancelling this worker
+                task = asyncio.ensure_future(self._render(job))
+                self._running[job.id] = task
+                await asyncio.wait([task])
+                del self._running[job.id]
+
+                if task.cancelled():
+                    result = RenderResult(job.id, job.outputPath, 'cancelled')
+                elif task.exception() is not None:
+                    # e.g. the process couldn't be started. Reported like any
+                    # other failure, so this worker carries on with the next job
+                    result = RenderResult(job.id, job.outputPath, 'failed', str(task.exception()))
+                else:
+                    result = task.result()
+
+            del self._jobs[job.id]
+            await self._finished.put(result)
+
+    async def _render(self, job: RenderJob) -> RenderResult:
+        # serialised off the event loop, and before the timeout starts,
+        # so a big description isn't counted against the job's time
+        payload = await asyncio.get_running_loop().run_in_executor(None, lambda: json.dumps(job.description).encode())
+
+        process = None
+        spawn = asyncio.ensure_future(asyncio.create_subprocess_exec(
+            sys.executable, TIMELINE_SCRIPT, '-', '--output', job.outputPath,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        ))
+        try:
+            # shielded, so that a cancel while the process is starting
+            # still leaves a process to kill rather than an orphan
+            process = await asyncio.shield(spawn)
+            _, stderr = await asyncio.wait_for(process.communicate(payload), job.timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            return RenderResult(job.id, job.outputPath, 'timeout')
+        except asyncio.CancelledError:
+            if process is None:
+                process = await spawn
+            await self._kill(process)
+            raise
+
+        if process.returncode != 0:
+            return RenderResult(job.id, job.outputPath, 'failed', stderr.decode(errors='replace'))
+        return RenderResult(job.id, job.outputPath, 'done')
+
+    @staticmethod
+    async def _kill(process):
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
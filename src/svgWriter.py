@@ -0,0 +1,172 @@
+import typing
+from xml.sax.saxutils import escape
+
+import matplotlib.colors as mc
+
+from timelineData import *
+from colorGenerator import ColorGenerator, colors, lighten_color
+
+# A lightweight SVG writer for Gantt and event charts.
+#
+# matplotlib's SVG backend writes a full path with its own style for every
+# bar, which adds up on charts with many dashes. This writes one compact
+# <rect> or <text> per element, styled by shared CSS classes, straight to the
+# output file as the chart is walked, so nothing but the databases themselves
+# is held in memory.
+
+CHART_TYPES = ('gantt', 'event') # the chart types this writer can draw
+
+LANE_HEIGHT = 20 # pixels per gantt lane, bars take 90% of it like in ganttChart
+EVENT_HEIGHT = 120 # pixels for an event chart
+TITLE_HEIGHT = 20
+AXIS_HEIGHT = 30
+MARGIN = 20
+
+STYLESHEET = """
+text { font-family: sans-serif; font-size: 10px; }
+.title { font-size: 12px; font-weight: bold; }
+.grid { stroke: #b0b0b0; stroke-width: 0.8; }
+.minor { stroke: #e0e0e0; stroke-width: 0.5; }
+.axis { stroke: black; stroke-width: 0.8; }
+.stem { stroke: #1f77b4; stroke-width: 1; }
+.marker { fill: #1f77b4; }
+"""
+
+def paletteClasses() -> typing.Tuple[typing.Dict[tuple, int], str]:
+    """Map every :mod:`colorGenerator` color to a CSS class
+
+    Dashes get class ``c<n>`` and their extensions ``x<n>``, where ``n`` is
+    the index of the color in the palette.
+
+    :return: The class index of every RGB color, and the CSS rules for them
+    :rtype: tuple[dict, str]
+    """
+    indices = { }
+    rules = [ ]
+    for index, color in enumerate(colors):
+        rgb = mc.to_rgb(color)
+        indices[rgb] = index
+        rules.append(f".c{index} {{ fill: {mc.to_hex(rgb)}; }}")
+        rules.append(f".x{index} {{ fill: {mc.to_hex(lighten_color(rgb, 0.5))}; stroke: {mc.to_hex(rgb)}; stroke-dasharray: 4 2; }}")
+    return indices, "\n".join(rules)
+
+def fmt(number: float) -> str:
+    """Shortest reasonable representation of a coordinate"""
+    return f"{number:.1f}".rstrip('0').rstrip('.')
+
+def writeSVG(dataFileJSON: dict, outputPath: str, width: int = 1600):
+    """Write the Gantt and event charts in the description to an SVG file
+
+    Charts are stacked top to bottom in the order they are listed, and share
+    the date axis at the bottom, like the matplotlib output.
+
+    :param dataFileJSON: The parsed chart description
+    :type dataFileJSON: dict
+    :param outputPath: Where to write the SVG
+    :type outputPath: str
+    :param width: The width of the image in pixels
+    :type width: int
+    :raises ValueError: If the description contains linear or area charts
+    """
+    databases = buildDatabases(dataFileJSON)
+    for database in databases:
+        if database.type not in CHART_TYPES:
+            raise ValueError(f"the lightweight SVG writer cannot draw {database.type} charts")
+
+    domain = TimeDomain(dataFileJSON, databases)
+
+    plotLeft = MARGIN
+    plotWidth = width - 2 * MARGIN
+    scale = plotWidth / domain.span()
+
+    def x(date: float) -> float:
+        return plotLeft + (date - domain.start) * scale
+
+    # the lanes have to be known up front to size the image,
+    # but they only hold references to the dashes
+    layouts = [ ]
+    height = MARGIN
+    for database in databases:
+        if database.type == 'gantt':
+            lanes = database.stackDashes()
+            bandHeight = len(lanes) * LANE_HEIGHT
+        else:
+            lanes = None
+            bandHeight = EVENT_HEIGHT
+        layouts.append((database, lanes, height, bandHeight))
+        height += TITLE_HEIGHT + bandHeight
+    plotBottom = height
+    height += AXIS_HEIGHT
+
+    classIndices, paletteRules = paletteClasses()
+
+    with open(outputPath, 'w') as out:
+        out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n')
+        out.write(f'<style>{STYLESHEET}{paletteRules}\n</style>\n')
+        out.write(f'<defs><clipPath id="plot"><rect x="{plotLeft}" y="0" width="{plotWidth}" height="{plotBottom}"/></clipPath></defs>\n')
+
+        ## Shared date axis, with grid lines through every chart
+
+        out.write(f'<line class="axis" x1="{plotLeft}" y1="{plotBottom}" x2="{plotLeft + plotWidth}" y2="{plotBottom}"/>\n')
+        for tick in domain.minorTicks():
+            out.write(f'<line class="minor" x1="{fmt(x(tick))}" y1="{MARGIN}" x2="{fmt(x(tick))}" y2="{plotBottom + 2}"/>')
+        out.write('\n')
+        for tick, label in zip(domain.majorTicks(), domain.majorTickLabels()):
+            out.write(f'<line class="grid" x1="{fmt(x(tick))}" y1="{MARGIN}" x2="{fmt(x(tick))}" y2="{plotBottom + 4}"/>')
+            out.write(f'<text x="{fmt(x(tick))}" y="{plotBottom + 16}" text-anchor="middle">{label}</text>\n')
+
+        for database, lanes, top, bandHeight in layouts:
+            out.write(f'<text class="title" x="{plotLeft}" y="{top + TITLE_HEIGHT - 6}">{escape(database.title)}</text>\n')
+            bandTop = top + TITLE_HEIGHT
+            out.write(f'<g clip-path="url(#plot)">\n')
+            if database.type == 'gantt':
+                writeGanttLanes(out, lanes, bandTop, x, domain.start, classIndices)
+            else:
+                writeEvents(out, database, bandTop, x, scale)
+            out.write('</g>\n')
+
+        out.write('</svg>\n')
+
+def writeGanttLanes(out: typing.TextIO, lanes: typing.List[typing.List[Dash]], top: float, x: typing.Callable[[float], float], minDate: float, classIndices: typing.Dict[tuple, int]):
+    """Write the dashes of a Gantt chart, one lane after another
+
+    Mirrors ``timelineCharts.ganttChart``: lanes are colored by the same
+    :func:`colorGenerator.ColorGenerator` sequence, extensions get the
+    lighter, dashed style, and labels sit a third of the way into their dash.
+    """
+    barHeight = LANE_HEIGHT * 0.9
+    for level, stack in enumerate(lanes):
+        # level 0 is drawn at the bottom, as in matplotlib
+        y = top + (len(lanes) - 1 - level) * LANE_HEIGHT
+        for dash, (hue, lighterHue) in zip(stack, ColorGenerator()):
+            colorClass = classIndices[hue]
+            out.write(f'<rect class="c{colorClass}" x="{fmt(x(dash.start))}" y="{fmt(y)}" width="{fmt(x(dash.end) - x(dash.start))}" height="{fmt(barHeight)}"/>')
+            if dash.extendTo is not None:
+                out.write(f'<rect class="x{colorClass}" x="{fmt(x(dash.end))}" y="{fmt(y)}" width="{fmt(x(dash.maxEnd) - x(dash.end))}" height="{fmt(barHeight)}"/>')
+            if dash.start > minDate:
+                labelDate = dash.start + (dash.duration() * 0.33)
+            else:
+                # otherwise the text will be off the chart
+                labelDate = minDate
+            out.write(f'<text x="{fmt(x(labelDate))}" y="{fmt(y + barHeight * 0.7)}">{escape(dash.name)}</text>\n')
+
+def writeEvents(out: typing.TextIO, database: EventDatabase, top: float, x: typing.Callable[[float], float], scale: float):
+    """Write the stems, markers and labels of an event chart
+
+    Mirrors ``timelineCharts.eventChart``: labels are staggered by
+    :meth:`timelineData.EventDatabase.layout` and angled up and to the right
+    from the top of their stem, and markers for several events are bigger.
+    Labels that don't fit in the chart's height are left out.
+    """
+    layout = database.layout(LABEL_SEPARATION / scale, max(1, EVENT_HEIGHT // LABEL_HEIGHT - 1))
+    baseline = top + EVENT_HEIGHT - 4
+    levelHeight = (EVENT_HEIGHT - 4) / (layout.maxLevel() + 1)
+    for date, count, level, label in zip(layout.dates, layout.counts, layout.levels, layout.labels):
+        eventX = fmt(x(date))
+        out.write(f'<circle class="marker" cx="{eventX}" cy="{fmt(baseline)}" r="{fmt(3 * count ** 0.25)}"/>')
+        # level 0 means the label didn't fit, only the marker is drawn
+        if level > 0:
+            stemTop = baseline - level * levelHeight
+            out.write(f'<line class="stem" x1="{eventX}" y1="{fmt(baseline)}" x2="{eventX}" y2="{fmt(stemTop)}"/>')
+            out.write(f'<text x="{eventX}" y="{fmt(stemTop)}" transform="rotate(-45 {eventX} {fmt(stemTop)})">{escape(label)}</text>')
+        out.write('\n')
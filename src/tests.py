@@ -1,5 +1,16 @@
+import asyncio
+import os
+import tempfile
 import unittest
+import xml.dom.minidom
 from timelineData import *
+from renderQueue import RenderQueue
+from svgWriter import writeSVG
+from memoryBudget import MemoryBudget, writePNGInStrips
+from timelineCharts import renderFigure
+from validation import validateDescription
+from matplotlib.figure import Figure
+import matplotlib.image
 
 class TestGanttDatabase(unittest.TestCase):
     def setUp(self):
@@ -130,4 +141,480 @@ class TestGanttDatabase(unittest.TestCase):
 
         database = GanttDatabase(definition)
 
-        self.assertEqual(database.maxOverlaps, 2)
\ No newline at end of file
+        self.assertEqual(database.maxOverlaps, 2)
+
+class TestEventDatabase(unittest.TestCase):
+    def test_layout_clusters_and_staggers(self):
+        definition = {}
+        definition['type'] = 'event'
+        definition['title'] = 'Test'
+        definition['data'] = [
+            {'label': 'D', 'date': 10},
+            {'label': 'A', 'date': 0},
+            {'label': 'B', 'date': 0.5},
+            {'label': 'C', 'date': 0.5},
+            {'label': 'E', 'date': 1}
+        ]
+
+        layout = EventDatabase(definition).layout(minSeparation=1)
+
+        self.assertEqual(list(layout.dates), [0, 0.5, 1, 10])
+        self.assertEqual(list(layout.counts), [1, 2, 1, 1])
+        self.assertEqual(layout.labels, ['A', 'B (+1)', 'E', 'D'])
+        # E is a full separation away from A, so it can go back down to level 1
+        self.assertEqual(list(layout.levels), [1, 2, 1, 1])
+
+    def test_layout_max_levels(self):
+        definition = {}
+        definition['type'] = 'event'
+        definition['title'] = 'Test'
+        definition['data'] = [{'label': 'Test', 'date': date} for date in range(6)]
+
+        layout = EventDatabase(definition).layout(minSeparation=3, maxLevels=2)
+
+        # the labels that don't fit are dropped, the markers stay
+        self.assertEqual(list(layout.levels), [1, 2, 0, 1, 2, 0])
+        self.assertEqual(list(layout.labelled()), [0, 1, 3, 4])
+        self.assertEqual(list(layout.counts), [1] * 6)
+
+class TestDatabase(unittest.TestCase):
+    def setUp(self):
+        self.definition = {}
+        self.definition['type'] = 'area'
+        self.definition['title'] = 'Test'
+        self.definition['data'] = [
+            {'title': 'Test', 'entries': [{'date': 0, 'value': 2}, {'date': 4, 'value': 6}]},
+            {'title': 'Test', 'entries': [{'date': 1, 'value': 1}, {'date': 2, 'value': 3}]}
+        ]
+
+    def test_align_interpolate(self):
+        dates, values = Database(self.definition).alignedValues()
+
+        self.assertEqual(list(dates), [0, 1, 2, 4])
+        self.assertEqual(values.tolist(), [[2, 3, 4, 6], [0, 1, 3, 3]])
+
+    def test_align_forward_fill(self):
+        self.definition['alignment'] = 'forwardFill'
+
+        dates, values = Database(self.definition).alignedValues()
+
+        self.assertEqual(list(dates), [0, 1, 2, 4])
+        self.assertEqual(values.tolist(), [[2, 2, 2, 6], [0, 1, 3, 3]])
+
+    def test_align_shared_dates(self):
+        self.definition['data'][1]['entries'] = [{'date': 0, 'value': 1}, {'date': 4, 'value': 1}]
+
+        dates, values = Database(self.definition).alignedValues()
+
+        self.assertEqual(list(dates), [0, 4])
+        self.assertEqual(values.tolist(), [[2, 6], [1, 1]])
+        self.assertTrue(values.flags['C_CONTIGUOUS'])
+
+class TestTimeDomain(unittest.TestCase):
+    def setUp(self):
+        self.description = {
+            'charts': [
+                {
+                    'type': 'gantt',
+                    'title': 'Test',
+                    'data': [{'label': 'Test', 'start': 0, 'end': 2, 'extendTo': 4}]
+                },
+                {
+                    'type': 'area',
+                    'title': 'Test',
+                    'data': [
+                        {'title': 'Test', 'entries': [{'date': -3, 'value': 1}, {'date': 1, 'value': 1}]},
+                        {'title': 'Test', 'entries': [{'date': 0, 'value': 1}, {'date': 7, 'value': 1}]}
+                    ]
+                }
+            ]
+        }
+
+    def test_bounds_include_every_chart(self):
+        domain = TimeDomain(self.description, buildDatabases(self.description))
+
+        self.assertEqual((domain.start, domain.end), (-3, 7))
+
+    def test_specified_range_and_ticks(self):
+        self.description['start'] = -2.5
+        self.description['majorInterval'] = 2
+
+        domain = TimeDomain(self.description, buildDatabases(self.description))
+
+        self.assertEqual((domain.start, domain.end), (-2.5, 7))
+        self.assertEqual(list(domain.majorTicks()), [-2, 0, 2, 4, 6])
+        self.assertEqual(len(domain.minorTicks()), 0)
+
+class TestMemoryBudget(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.description = {
+            'charts': [
+                {
+                    'type': 'gantt',
+                    'title': 'Test',
+                    'data': [
+                        {'label': 'Test', 'start': 0, 'end': 2, 'extendTo': 4},
+                        {'label': 'Test', 'start': 1, 'end': 5}
+                    ]
+                }
+            ]
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_frees_description_and_reports_stages(self):
+        budget = MemoryBudget(100, report=None)
+
+        renderFigure(self.description, Figure(), budget)
+
+        self.assertIsNone(self.description['charts'][0]['data'])
+        self.assertEqual([name for name, peak in budget.stages], ['layout', 'draw'])
+
+    def test_strips_match_whole_image(self):
+        figure = renderFigure(self.description, Figure(figsize=(4, 3)))
+        wholePath = os.path.join(self.directory.name, 'whole.png')
+        stripsPath = os.path.join(self.directory.name, 'strips.png')
+
+        figure.savefig(wholePath)
+        # buffers of 25 rows, so the last strip is shorter than the others
+        writePNGInStrips(figure, stripsPath, 25 * 4 * 400)
+
+        whole = matplotlib.image.imread(wholePath)
+        strips = matplotlib.image.imread(stripsPath)
+        self.assertEqual(whole.shape, strips.shape)
+        self.assertLess(abs(whole - strips).max(), 0.05)
+
+class TestISODates(unittest.TestCase):
+    def setUp(self):
+        self.description = {
+            'charts': [
+                {
+                    'type': 'gantt',
+                    'title': 'Test',
+                    'data': [
+                        {'label': 'Test', 'start': '1970-01-02', 'end': '1970-01-03T12:00', 'extendTo': '1970-01-05'},
+                        {'label': 'Test', 'start': '1969-12-31', 'end': '1970-01-01'}
+                    ]
+                },
+                {
+                    'type': 'event',
+                    'title': 'Test',
+                    'data': [{'label': 'Test', 'date': '1971'}]
+                },
+                {
+                    'type': 'linear',
+                    'title': 'Test',
+                    'data': [{'title': 'Test', 'entries': [{'date': '1970-02-01', 'value': 1}]}]
+                }
+            ]
+        }
+
+    def test_dates_become_days_since_1970(self):
+        gantt, events, linear = buildDatabases(self.description)
+
+        self.assertTrue(gantt.isDate and events.isDate and linear.isDate)
+        self.assertEqual([(dash.start, dash.end, dash.extendTo) for dash in gantt.dashes], [(-1, 0, None), (1, 2.5, 4)])
+        self.assertEqual(list(events.dates), [365])
+        self.assertEqual(list(linear.allDates()), [31])
+
+    def test_extend_to_after_a_dash_without_one(self):
+        gantt = GanttDatabase({
+            'type': 'gantt',
+            'title': 'Test',
+            'data': [
+                {'label': 'Test', 'start': '1970-01-01', 'end': '1970-01-02'},
+                {'label': 'Test', 'start': '1970-01-03', 'end': '1970-01-04', 'extendTo': '1971'}
+            ]
+        })
+
+        self.assertEqual([(dash.start, dash.end, dash.extendTo) for dash in gantt.dashes], [(0, 1, None), (2, 3, 365)])
+
+    def test_calendar_ticks(self):
+        self.description['end'] = '1990-06-01'
+        self.description['majorInterval'] = '5Y'
+
+        domain = TimeDomain(self.description, buildDatabases(self.description))
+
+        self.assertTrue(domain.isDate)
+        self.assertEqual(domain.majorTickLabels(), ['1970', '1975', '1980', '1985', '1990'])
+        self.assertEqual(domain.majorTicks()[1], 1826)
+
+    def test_interval_in_days(self):
+        self.description['start'] = '1970-01-01'
+        self.description['end'] = '1970-03-01'
+        self.description['majorInterval'] = 30
+
+        domain = TimeDomain(self.description, buildDatabases(self.description))
+        figure = renderFigure(self.description, Figure())
+        figure.canvas.draw()
+
+        self.assertEqual(domain.majorTickLabels(), ['1970-01-01', '1970-01-31'])
+        self.assertIn('1970-01-31', [label.get_text() for label in figure.axes[0].get_xticklabels()])
+
+    def test_bad_interval(self):
+        with self.assertRaises(ValueError):
+            parseInterval('5 years')
+
+class TestValidation(unittest.TestCase):
+    def test_valid_description(self):
+        description = {
+            'start': '1900',
+            'majorInterval': '10Y',
+            'charts': [
+                {
+                    'type': 'gantt',
+                    'title': 'Test',
+                    'data': [
+                        {'label': 'Test', 'start': '1901', 'end': '1910-06', 'column': 0},
+                        {'label': 'Test', 'start': '1910-06', 'end': '1920', 'column': 0}
+                    ]
+                }
+            ]
+        }
+
+        self.assertEqual(validateDescription(description), [ ])
+
+    def test_reports_every_error(self):
+        description = {
+            'charts': [
+                {
+                    'type': 'gantt',
+                    'title': 'Test',
+                    'data': [
+                        {'label': 'Test', 'start': 2, 'end': 1},
+                        {'label': 'Test', 'start': 0, 'end': 10, 'column': 1},
+                        {'label': 'Test', 'start': 1, 'end': 2, 'column': 1},
+                        {'label': 'Test', 'start': 5, 'end': 6, 'column': 1}
+                    ]
+                },
+                {
+                    'type': 'linear',
+                    'title': 'Test',
+                    'primaryAxis': {'min': 0, 'interval': 1},
+                    'data': [{'title': 'Test', 'entries': [{'date': '1970', 'value': 1}]}]
+                },
+                {
+                    'type': 'area',
+                    'title': 'Test',
+                    'data': [
+                        {'title': 'Test', 'entries': [{'date': 1, 'value': 1}, {'date': 0, 'value': 1}]},
+                        {'title': 'Test', 'entries': [{'date': 0, 'value': 1}]}
+                    ],
+                    'alignment': 'nearest'
+                }
+            ]
+        }
+
+        errors = validateDescription(description)
+
+        self.assertEqual(errors, [
+            "charts[0].data[0]: end (1) is not after start (2)",
+            "charts[0].data[2]: overlaps charts[0].data[1], which is also pinned to column 1",
+            "charts[0].data[3]: overlaps charts[0].data[1], which is also pinned to column 1",
+            "charts[1].primaryAxis: missing 'max'",
+            "charts[1].data[0].entries[0].date: expected a number like the dates before it, got '1970'",
+            "charts[2].alignment: expected 'interpolate' or 'forwardFill', got 'nearest'",
+            "charts[2].data[0].entries[1]: date (0) does not come after the one before it"
+        ])
+
+    def test_rejects_descriptions_with_nothing_to_draw(self):
+        self.assertEqual(validateDescription({'charts': [ ]}), ["description.charts: expected at least one chart"])
+
+        description = {
+            'charts': [
+                {'type': 'event', 'title': 'Test', 'data': [ ]},
+                {'type': 'gantt', 'title': 'Test', 'data': [ ]},
+                {'type': 'gantt', 'title': 'Test', 'data': [{'label': 'Test', 'start': 1, 'end': 1}]}
+            ]
+        }
+
+        self.assertEqual(validateDescription(description), [
+            "charts[0].data: expected at least one event",
+            "charts[1].data: expected at least one dash",
+            "charts[2].data[0]: end (1) is not after start (1)"
+        ])
+
+    def test_calendar_interval_needs_iso_dates(self):
+        description = {
+            'majorInterval': '10Y',
+            'charts': [{'type': 'event', 'title': 'Test', 'data': [{'label': 'Test', 'date': 1}]}]
+        }
+
+        self.assertEqual(validateDescription(description), [
+            "description.majorInterval: expected a positive number, calendar intervals need ISO dates, got '10Y'"
+        ])
+
+    def test_rejects_nulls_and_impossible_dates(self):
+        self.assertEqual(validateDescription({'charts': None}), ["description.charts: expected a list, got None"])
+
+        description = {
+            'charts': [
+                {
+                    'type': 'event',
+                    'title': None,
+                    'data': [
+                        {'label': None, 'date': '2020-13-45'},
+                        {'label': 'Test', 'date': '2020-01-01T24:00'},
+                        {'label': 'Test', 'date': '2021-02-29'},
+                        {'label': 'Test', 'date': '2020-02-29'}
+                    ]
+                },
+                {'type': 'gantt', 'title': 'Test', 'data': None}
+            ]
+        }
+
+        self.assertEqual(validateDescription(description), [
+            "charts[0].title: expected a string, got None",
+            "charts[0].data[0].label: expected a string, got None",
+            "charts[0].data[0].date: expected a number or an ISO 8601 date, got '2020-13-45'",
+            "charts[0].data[1].date: expected a number or an ISO 8601 date, got '2020-01-01T24:00'",
+            "charts[0].data[2].date: expected a number or an ISO 8601 date, got '2021-02-29'",
+            "charts[1].data: expected a list, got None"
+        ])
+
+class TestRenderQueue(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.description = {
+            'charts': [
+                {
+                    'type': 'event',
+                    'title': 'Test',
+                    'data': [
+                        {'label': 'Test', 'date': 0},
+                        {'label': 'Test', 'date': 1}
+                    ]
+                }
+            ]
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def outputPath(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_results_stream_back(self):
+        async def run():
+            async with RenderQueue(workers=2, maxPending=1) as queue:
+                done = await queue.submit(self.description, self.outputPath('done.png'))
+                invalid = await queue.submit({'charts': [{'type': 'gantt'}]}, self.outputPath('invalid.png'))
+                failed = await queue.submit(self.description, self.outputPath(os.path.join('missing', 'failed.png')))
+                timedOut = await queue.submit(self.description, self.outputPath('timeout.png'), timeout=0.01)
+                cancelled = await queue.submit(self.description, self.outputPath('cancelled.png'))
+                queue.cancel(cancelled)
+                await queue.close()
+                return done, invalid, failed, timedOut, cancelled, [result async for result in queue.results()]
+
+        done, invalid, failed, timedOut, cancelled, results = asyncio.run(run())
+        statuses = {result.jobId: result.status for result in results}
+
+        self.assertEqual(statuses, {done: 'done', invalid: 'invalid', failed: 'failed', timedOut: 'timeout', cancelled: 'cancelled'})
+        self.assertTrue(os.path.exists(self.outputPath('done.png')))
+        self.assertFalse(os.path.exists(self.outputPath('cancelled.png')))
+
+    def test_worker_survives_a_job_that_cannot_start(self):
+        async def run():
+            async with RenderQueue(workers=1, maxPending=1) as queue:
+                broken = await queue.submit(self.description, None)
+                done = await queue.submit(self.description, self.outputPath('done.png'))
+                await queue.close()
+                return broken, done, [result async for result in queue.results()]
+
+        broken, done, results = asyncio.run(run())
+        statuses = {result.jobId: result.status for result in results}
+
+        self.assertEqual(statuses, {broken: 'failed', done: 'done'})
+    def test_close_waits_for_submits_in_progress(self):
+        async def run():
+            async with RenderQueue(workers=1) as queue:
+                submits = [
+                    asyncio.ensure_future(queue.submit(self.description, self.outputPath('done.png'))),
+                    asyncio.ensure_future(queue.submit({'charts': [ ]}, self.outputPath('invalid.png')))
+                ]
+                # let both submits start checking their description
+                await asyncio.sleep(0)
+                await queue.close()
+                jobIds = [await submit for submit in submits]
+                return jobIds, [result async for result in queue.results()], queue._jobs
+
+        (done, invalid), results, jobs = asyncio.run(run())
+        statuses = {result.jobId: result.status for result in results}
+
+        self.assertEqual(statuses, {done: 'done', invalid: 'invalid'})
+        self.assertEqual(jobs, { })
+
+class TestSVGWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.outputPath = os.path.join(self.directory.name, 'chart.svg')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_one_rect_per_dash(self):
+        description = {
+            'charts': [
+                {
+                    'type': 'gantt',
+                    'title': 'People & <Places>',
+                    'data': [
+                        {'label': 'Test', 'start': 0, 'end': 2, 'extendTo': 3},
+                        {'label': 'Test', 'start': 1, 'end': 5},
+                        {'label': 'Test', 'start': 4, 'end': 6}
+                    ]
+                },
+                {
+                    'type': 'event',
+                    'title': 'Test',
+                    'data': [
+                        {'label': 'Test', 'date': 2},
+                        {'label': 'Test', 'date': 3}
+                    ]
+                }
+            ]
+        }
+
+        writeSVG(description, self.outputPath)
+        document = xml.dom.minidom.parse(self.outputPath)
+
+        rects = [rect for rect in document.getElementsByTagName('rect') if rect.getAttribute('class')]
+        self.assertEqual(len(rects), 4)
+        self.assertEqual(len([rect for rect in rects if rect.getAttribute('class').startswith('x')]), 1)
+        self.assertEqual(len(document.getElementsByTagName('circle')), 2)
+
+    def test_minor_grid(self):
+        description = {
+            'minorInterval': 0.5,
+            'charts': [{'type': 'event', 'title': 'Test', 'data': [{'label': 'Test', 'date': 0}, {'label': 'Test', 'date': 2}]}]
+        }
+
+        writeSVG(description, self.outputPath)
+        document = xml.dom.minidom.parse(self.outputPath)
+
+        minor = [line for line in document.getElementsByTagName('line') if line.getAttribute('class') == 'minor']
+        self.assertEqual(len(minor), 5)
+
+    def test_single_date(self):
+        description = {'charts': [{'type': 'event', 'title': 'Test', 'data': [{'label': 'Test', 'date': 2}]}]}
+
+        writeSVG(description, self.outputPath)
+        document = xml.dom.minidom.parse(self.outputPath)
+
+        self.assertEqual(document.getElementsByTagName('circle')[0].getAttribute('cx'), '800')
+
+    def test_rejects_numerical_charts(self):
+        description = {
+            'charts': [
+                {
+                    'type': 'linear',
+                    'title': 'Test',
+                    'data': [{'title': 'Test', 'entries': [{'date': 0, 'value': 1}]}]
+                }
+            ]
+        }
+
+        with self.assertRaises(ValueError):
+            writeSVG(description, self.outputPath)
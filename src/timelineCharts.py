@@ -0,0 +1,270 @@
+from matplotlib import gridspec
+from matplotlib import ticker
+from matplotlib import dates as mdates
+from matplotlib.figure import Figure
+import numpy
+
+from timelineData import *
+from colorGenerator import ColorGenerator
+from memoryBudget import MemoryBudget, writePNGInStrips
+
+### Biographical information
+
+# the most dashes drawn by a single collection
+ARTIST_CHUNK = 1000
+
+# for database in ganttData:
+def ganttChart(chart, database: GanttDatabase, domain: TimeDomain):
+
+    ## Organize and sort biographical information
+
+    # gantt dashes will be compacted. There will not be a single
+    # row for every dash
+    dashStacks = database.stackDashes()
+
+    ## Plot biographical information
+
+    chart.set_yticks([])
+    chart.grid(axis="x")
+
+    for stack, level in zip(dashStacks, range(len(dashStacks))):
+        # each lane keeps its own color sequence across chunks
+        hues = ColorGenerator()
+        # draw the lane in chunks, each a single collection for its bars and
+        # one for its extensions, rather than an artist for every dash
+        for chunkStart in range(0, len(stack), ARTIST_CHUNK):
+            bars, barHues = [ ], [ ]
+            extensions, extensionHues = [ ], [ ]
+            for dash, (hue, lighterHue) in zip(stack[chunkStart:chunkStart + ARTIST_CHUNK], hues): # zip only uses shortest
+                bars.append((dash.start, dash.duration()))
+                barHues.append(hue)
+                if dash.extendTo is not None:
+                    # If this dash is to be extended, put another dash at the end of this dash
+                    # that has a dashed line border, and that lighter color as the fill
+                    extensions.append((dash.end, dash.extendedDuration()))
+                    extensionHues.append(lighterHue)
+                if dash.start > domain.start:
+                    chart.text(dash.start + (dash.duration() * 0.33), 10 * level + 3, dash.name, rotation=30)
+                else:
+                    # otherwise the text will be off the chart
+                    # so place the text at the beginning of the chart, and not the beginning of the dash
+                    chart.text(domain.start, 10 * level + 3, dash.name, rotation=30)
+            chart.broken_barh(bars, (10 * level, 9), color=barHues)
+            if len(extensions) > 0:
+                chart.broken_barh(extensions, (10 * level, 9), color=extensionHues, linestyle="--")
+
+### Linear Data
+
+# for database in linearData:
+def linearChart(primary, database: Database):
+    secondary = primary.twinx()
+
+    for series in database.serieses:
+        chart = primary if series.isPrimary else secondary
+        style = "--" if series.isDashed else "-"
+
+        chart.plot(series.dates, series.data, label=series.name, linestyle=style)
+    
+    primary.legend(loc=2)
+    if database.primaryAxis is not None:
+        primary.set_ylim(bottom=database.primaryAxis.min, top=database.primaryAxis.max)
+    secondary.legend(loc=1)
+    if database.secondaryAxis is not None:
+        print(f'max: {database.secondaryAxis.max}')
+        print(f'min: {database.secondaryAxis.min}')
+        secondary.set_ylim(bottom=database.secondaryAxis.min, top=database.secondaryAxis.max)
+
+### Area Data
+
+# for database in areaData:
+def areaChart(chart, database: Database):
+    # the series don't have to share their dates, they are put on one grid first
+    dates, values = database.alignedValues()
+    chart.stackplot(dates, values, labels=database.getColumnLabels())
+    chart.legend()
+
+### Event Data
+
+# for database in eventData:
+def eventChart(chart, database: EventDatabase, domain: TimeDomain):
+    # space labels by how far apart they are on screen, not in time,
+    # and only stack as many levels as fit in the chart's height
+    extent = chart.get_window_extent()
+    pixelsPerDate = extent.width / domain.span()
+    maxLevels = max(1, int(extent.height / LABEL_HEIGHT) - 1)
+    layout = database.layout(LABEL_SEPARATION / pixelsPerDate, maxLevels)
+
+    # one collection for all the stems and one for all the markers,
+    # markers that stand for several events are drawn bigger
+    chart.vlines(layout.dates, 0, layout.levels, color="tab:blue")
+    chart.scatter(layout.dates, numpy.zeros(len(layout.dates)), s=20 * numpy.sqrt(layout.counts), color="tab:blue", zorder=3)
+
+    # labels that didn't fit are left out, so there are at most a few
+    # hundred of these however many events there are
+    for index in layout.labelled():
+        chart.annotate(
+            layout.labels[index],
+            xy=(layout.dates[index], layout.levels[index]),
+            xytext=(0,0),
+            textcoords="offset points",
+            va="top", ha="left",
+            rotation_mode="anchor",
+            rotation=45
+        )
+
+    chart.set_ylim(0, layout.maxLevel() + 1) # give room for the text
+
+    chart.get_yaxis().set_visible(False)
+
+### Get applicable subplots
+
+# date labels for ticks a plain number of days apart, by dayIntervalUnit()
+NUMERIC_INTERVAL_FORMATS = {'D': '%Y-%m-%d', 'm': '%Y-%m-%d %H:%M', 's': '%Y-%m-%d %H:%M:%S'}
+
+def dateLocator(interval):
+    """A matplotlib locator for an interval from the description
+
+    :param interval: A number, or a calendar interval like ``10Y`` for ISO dates
+    :type interval: float or str
+    :return: The locator
+    :rtype: matplotlib.ticker.Locator
+    """
+    if not isinstance(interval, str):
+        return ticker.MultipleLocator(interval)
+
+    count, unit = parseInterval(interval)
+    if unit == 'Y':
+        return mdates.YearLocator(count)
+    elif unit == 'M':
+        return mdates.MonthLocator(interval=count)
+    elif unit == 'W':
+        return mdates.DayLocator(interval=7 * count)
+    elif unit == 'D':
+        return mdates.DayLocator(interval=count)
+    elif unit == 'h':
+        return mdates.HourLocator(interval=count)
+    elif unit == 'm':
+        return mdates.MinuteLocator(interval=count)
+    else:
+        return mdates.SecondLocator(interval=count)
+
+def renderFigure(dataFileJSON: dict, figure: Figure, budget: MemoryBudget = None) -> Figure:
+    """Lay out and draw every chart in the description onto ``figure``
+
+    :param dataFileJSON: The parsed chart description
+    :type dataFileJSON: dict
+    :param figure: The figure to draw on
+    :type figure: matplotlib.figure.Figure
+    :param budget: If given, the ``data`` of every chart in the description is
+        dropped once the databases are built, and memory use is recorded
+    :type budget: MemoryBudget
+    :return: The same figure, for convenience
+    :rtype: matplotlib.figure.Figure
+    """
+    databases = buildDatabases(dataFileJSON)
+    if budget is not None:
+        # the databases hold everything the charts need from here on
+        for chart in dataFileJSON['charts']:
+            chart['data'] = None
+        budget.stage('layout')
+
+    ganttData = [base for base in databases if base.type == 'gantt']
+
+    # calculate height ratios for the plots, shrinking gantt plots with fewer elements
+    heights = [ ]
+
+    # Get the maximum number of overlaps for all gantt charts
+    # and use that to scale the height of the gantt charts
+    maxGantt = 1
+    if len(ganttData) > 0:
+        maxGantt = max(ganttData, key= lambda database : database.maxOverlaps).maxOverlaps
+
+    for database in databases:
+        if database.type == 'gantt':
+            heights.append(database.maxOverlaps / maxGantt)
+        elif database.type == 'linear':
+            heights.append(1.0)
+        elif database.type == 'area':
+            heights.append(1.0)
+        elif database.type == 'event':
+            heights.append(0.5)
+    del ganttData
+
+    gdspec = gridspec.GridSpec(len(databases), 1, height_ratios=heights, figure=figure)
+
+    # the date range is worked out once, before drawing, so that event labels can be spaced on screen
+    domain = TimeDomain(dataFileJSON, databases)
+
+    # every chart shares the x axis of the first one, so the range and
+    # tick locators only need to be set once
+    firstChart = None
+
+    # running index for charts
+    chartIndex = 0
+    while len(databases) > 0:
+        # take each database off the list, so it is freed once its chart is drawn
+        database = databases.pop(0)
+        chart = figure.add_subplot(gdspec[chartIndex], sharex=firstChart)
+        if firstChart is None:
+            firstChart = chart
+            chart.set_xlim(domain.start, domain.end)
+        if database.type == 'gantt':
+            ganttChart(chart, database, domain)
+        elif database.type == 'linear':
+            linearChart(chart, database)
+        elif database.type == 'area':
+            areaChart(chart, database)
+        elif database.type == 'event':
+            eventChart(chart, database, domain)
+        chartIndex += 1
+    database = None
+
+    # users can specify a year interval for ticks
+    if firstChart is not None:
+        if domain.majorInterval is not None:
+            firstChart.xaxis.set_major_locator(dateLocator(domain.majorInterval))
+        elif domain.isDate:
+            firstChart.xaxis.set_major_locator(mdates.AutoDateLocator())
+        if domain.minorInterval is not None:
+            firstChart.xaxis.set_minor_locator(dateLocator(domain.minorInterval))
+
+        # ISO dates are plotted as days since 1970, label them as dates
+        if domain.isDate and domain.majorInterval is not None and not isinstance(domain.majorInterval, str):
+            # a plain number of days doesn't line up with months or years,
+            # which ConciseDateFormatter would leave out of the labels
+            firstChart.xaxis.set_major_formatter(mdates.DateFormatter(NUMERIC_INTERVAL_FORMATS[dayIntervalUnit(domain.majorInterval)]))
+        elif domain.isDate:
+            firstChart.xaxis.set_major_formatter(mdates.ConciseDateFormatter(firstChart.xaxis.get_major_locator()))
+
+    if budget is not None:
+        budget.stage('draw')
+
+    return figure
+
+def renderToFile(dataFileJSON: dict, outputPath: str, budget: MemoryBudget = None):
+    """Render the description straight to an image file, without a window
+
+    The figure is created without pyplot, so this is safe to call from
+    worker processes. The format is inferred from the file extension.
+
+    :param dataFileJSON: The parsed chart description
+    :type dataFileJSON: dict
+    :param outputPath: Where to write the image
+    :type outputPath: str
+    :param budget: If given, a PNG whose pixel buffer would not fit in the
+        budget's raster share is rasterised in strips. See :class:`memoryBudget.MemoryBudget`
+    :type budget: MemoryBudget
+    """
+    figure = renderFigure(dataFileJSON, Figure(), budget)
+
+    if budget is not None and outputPath.lower().endswith('.png'):
+        widthInches, heightInches = figure.get_size_inches()
+        if widthInches * heightInches * figure.dpi ** 2 * 4 > budget.rasterBytes():
+            writePNGInStrips(figure, outputPath, budget.rasterBytes())
+        else:
+            figure.savefig(outputPath)
+    else:
+        figure.savefig(outputPath)
+
+    if budget is not None:
+        budget.stage('rasterise')
@@ -1,6 +1,141 @@
+import heapq
+import math
+import re
 import typing
+import warnings
 import numpy
 
+# ISO 8601 dates are plotted as days since this date, which is also
+# matplotlib's default date epoch
+EPOCH = numpy.datetime64('1970-01-01T00:00:00', 'ms')
+MILLISECONDS_PER_DAY = 86400000
+
+# tick intervals for date axes shorter than a couple of years, with their
+# rough length in days, from shortest to longest
+CALENDAR_INTERVALS = [
+    ('1s', 1 / 86400), ('15s', 15 / 86400), ('1m', 1 / 1440), ('15m', 15 / 1440),
+    ('1h', 1 / 24), ('6h', 6 / 24), ('1D', 1), ('7D', 7),
+    ('1M', 30.44), ('3M', 91.31), ('6M', 182.62)
+]
+
+# the narrowest gap, in pixels, between two event labels on the same level,
+# shared by the matplotlib charts and the SVG writer
+LABEL_SEPARATION = 15
+# the height, in pixels, each level of event labels needs
+LABEL_HEIGHT = 15
+
+def isDateColumn(values: list) -> bool:
+    """Whether a column of dates holds ISO 8601 strings rather than decimal numbers
+
+    :param values: The dates as they appear in the description
+    :type values: list
+    :return: True if the first date is a string
+    :rtype: bool
+    """
+    return len(values) > 0 and isinstance(values[0], str)
+
+def toPlotDates(values: list, isDate: bool = None) -> numpy.ndarray:
+    """Convert a column of dates to the numbers they are plotted at
+
+    Decimal numbers are used as they are. ISO 8601 strings are parsed by
+    numpy in one go, without a Python call per value, and become days since
+    1970-01-01. Missing values (None) become NaN.
+
+    :param values: The dates as they appear in the description
+    :type values: list
+    :param isDate: Whether the values are ISO 8601 strings. Pass it for
+        columns that may start with a missing value, otherwise it is
+        decided by :func:`isDateColumn`
+    :type isDate: bool
+    :return: The plot coordinates
+    :rtype: numpy.ndarray
+    """
+    if isDate is None:
+        isDate = isDateColumn(values)
+    if not isDate:
+        return numpy.array(values, dtype=float)
+    with warnings.catch_warnings():
+        # numpy converts UTC offsets to UTC, but warns that it doesn't keep them
+        warnings.simplefilter('ignore', UserWarning)
+        dates = numpy.array(values, dtype='datetime64[ms]')
+    days = (dates - EPOCH).astype(float) / MILLISECONDS_PER_DAY
+    days[numpy.isnat(dates)] = numpy.nan
+    return days
+
+def fromPlotDates(days: numpy.ndarray) -> numpy.ndarray:
+    """The reverse of :func:`toPlotDates` for ISO dates
+
+    :param days: Days since 1970-01-01
+    :type days: numpy.ndarray
+    :return: The dates
+    :rtype: numpy.ndarray of numpy.datetime64
+    """
+    milliseconds = numpy.round(numpy.asarray(days, dtype=float) * MILLISECONDS_PER_DAY)
+    return EPOCH + milliseconds.astype('int64').astype('timedelta64[ms]')
+
+def parseInterval(interval: str) -> typing.Tuple[int, str]:
+    """Split a calendar interval like ``10Y`` into its count and unit
+
+    The units are those of numpy: ``Y`` years, ``M`` months, ``W`` weeks,
+    ``D`` days, ``h`` hours, ``m`` minutes and ``s`` seconds.
+
+    :param interval: The interval
+    :type interval: str
+    :raises ValueError: If the interval isn't a whole number followed by a unit
+    :return: The count and the unit
+    :rtype: tuple[int, str]
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*([YMWDhms])\s*', interval)
+    if match is None or int(match.group(1)) < 1:
+        raise ValueError(f"{interval!r} is not an interval like '10Y', '3M' or '7D'")
+    return int(match.group(1)), match.group(2)
+
+def dayIntervalUnit(interval: float) -> str:
+    """The finest numpy unit a date label needs for ticks a number of days apart
+
+    :param interval: The distance between ticks in days
+    :type interval: float
+    :return: ``D``, ``m`` or ``s``
+    :rtype: str
+    """
+    if interval >= 1:
+        return 'D'
+    elif interval >= 1 / 1440:
+        return 'm'
+    return 's'
+
+def dateBounds(columns: typing.List[numpy.ndarray]) -> typing.Tuple[float, float]:
+    """The earliest and latest date in any of the columns
+
+    :param columns: Arrays of dates
+    :type columns: list[numpy.ndarray]
+    :return: The earliest and latest date, or None and None if there are no dates
+    :rtype: tuple[float, float]
+    """
+    columns = [column for column in columns if len(column) > 0]
+    if len(columns) == 0:
+        return None, None
+    return min(column.min() for column in columns), max(column.max() for column in columns)
+
+def niceInterval(span: float, targetTicks: int = 10) -> float:
+    """Pick a round tick interval (1, 2 or 5 times a power of ten) for a date span
+
+    :param span: The distance between the first and last date
+    :type span: float
+    :param targetTicks: Roughly how many ticks there should be
+    :type targetTicks: int
+    :return: The interval between ticks
+    :rtype: float
+    """
+    if span <= 0:
+        return 1
+    rough = span / targetTicks
+    magnitude = 10 ** numpy.floor(numpy.log10(rough))
+    for multiple in (1, 2, 5):
+        if rough <= multiple * magnitude:
+            return multiple * magnitude
+    return 10 * magnitude
+
 class Dash:
     """Simple struct used for iteration in building the Gantt Chart
     
@@ -63,23 +198,56 @@ class Event:
         self.date = date
         self.brief = brief
 
+class EventLayout:
+    """Simple struct describing where the markers and labels of an event chart go
+
+    Events that share a date are collapsed into a single marker.
+
+    :cvar numpy.ndarray dates: The distinct event dates, in ascending order
+    :cvar numpy.ndarray counts: The number of events on each date
+    :cvar numpy.ndarray levels: The height of each label's stem, starting at 1.
+        0 for dates whose label didn't fit, which only get a marker
+    :cvar list[str] labels: The label for each date
+    """
+    def __init__(self, dates: numpy.ndarray, counts: numpy.ndarray, levels: numpy.ndarray, labels: typing.List[str]):
+        self.dates = dates
+        self.counts = counts
+        self.levels = levels
+        self.labels = labels
+
+    def maxLevel(self) -> int:
+        """The highest level any label was placed on
+
+        :return: The highest level, or 0 if there are no events
+        :rtype: int
+        """
+        return int(self.levels.max()) if len(self.levels) > 0 else 0
+
+    def labelled(self) -> numpy.ndarray:
+        """The indices of the dates whose label is drawn
+
+        :return: Indices into :attr:`dates`, :attr:`levels` and :attr:`labels`
+        :rtype: numpy.ndarray
+        """
+        return numpy.flatnonzero(self.levels > 0)
+
 class Series:
     """Encapsulates a numerical data series.
     
     It's basically a data series plus information on how to display it
 
-    :cvar Pandas.Series data: The Pandas Series representation of the data
-    :cvar Pandas.Series dates: The dates. Basically the index of the data
+    :cvar numpy.ndarray data: The values of the series
+    :cvar numpy.ndarray dates: The dates. Basically the index of the data
     :cvar str name: The name of the series
     :cvar boolean isPrimary: Indicates whether or not the data should be plotted against the primary or secondary axis
     :cvar boolean isDashed: Indicates whether or not the data should be drawn with the dashed line
     """
-    def __init__(self, data: typing.List[float], index: typing.List[float], name: str, isPrimary: bool, isDashed: bool):
+    def __init__(self, data: typing.List[float], index: numpy.ndarray, name: str, isPrimary: bool, isDashed: bool):
         # self.data = data #Pandas
         # self.dates = data.index.to_series() #Pandas index
 
-        self.data = data
-        self.dates = index
+        self.data = numpy.asarray(data, dtype=float)
+        self.dates = numpy.asarray(index, dtype=float)
         self.name = name
         self.isPrimary = isPrimary
         self.isDashed = isDashed
@@ -105,7 +273,7 @@ class Database:
     :type filename: str
     """
     def __init__(self, chartJSON: dict):
-        self.type = chartJSON['type']
+        self.type = chartJSON.get('type', 'linear')
         self.createDatabase(chartJSON)
 
     def createDatabase(self, chartJSON: dict):
@@ -129,6 +297,10 @@ class Database:
             interval = chartJSON['secondaryAxis']['interval']
             self.secondaryAxis = Axis(maximum, minimum, interval)
 
+        # how alignedValues() fills in series that have no entry on a date
+        self.alignment = chartJSON.get('alignment', 'interpolate')
+
+        self.isDate = False
         for series in chartJSON['data']:
             data = [ ]
             index = [ ]
@@ -142,10 +314,10 @@ class Database:
             isDashed = False
             if 'style' in series and series['style'] == 'dashed':
                 isDashed = True
-            self.serieses.append(Series(data, index, title, isPrimary, isDashed))
+            self.isDate = self.isDate or isDateColumn(index)
+            self.serieses.append(Series(data, toPlotDates(index), title, isPrimary, isDashed))
 
-        self.minDate = min(self.serieses[0].dates)
-        self.maxDate = max(self.serieses[0].dates)
+        self.minDate, self.maxDate = dateBounds([series.dates for series in self.serieses])
 
     def numItems(self) -> int:
         """Return the number of data points
@@ -185,6 +357,53 @@ class Database:
             values.append(series.data)
         return values
 
+    def alignedValues(self, alignment: str = None) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """Every series' values on one shared grid of dates, ready to be stacked
+
+        The grid is every date any series has an entry for. Each series is
+        filled in on the dates it has no entry for, by ``alignment``:
+
+        * ``interpolate``: linearly between its neighbouring entries
+        * ``forwardFill``: with its last value before that date
+
+        Before a series' first entry it counts as 0. After its last entry it
+        keeps its last value, with either alignment.
+
+        :param alignment: ``interpolate`` or ``forwardFill``, defaults to the chart's ``alignment``
+        :type alignment: str
+        :raises ValueError: If the alignment is neither
+        :return: The grid, and an array with a row of values for every series
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        if alignment is None:
+            alignment = self.alignment
+        if alignment not in ('interpolate', 'forwardFill'):
+            raise ValueError(f"alignment must be 'interpolate' or 'forwardFill', not {alignment!r}")
+
+        # nothing to do if the series already share their dates
+        first = self.serieses[0].dates
+        if all(numpy.array_equal(series.dates, first) for series in self.serieses[1:]):
+            return first, numpy.vstack([series.data for series in self.serieses])
+
+        grid = numpy.unique(numpy.concatenate([series.dates for series in self.serieses]))
+        values = numpy.zeros((len(self.serieses), len(grid)))
+        for row, series in zip(values, self.serieses):
+            order = numpy.argsort(series.dates, kind='stable')
+            dates = series.dates[order]
+            data = series.data[order]
+            if len(dates) == 0:
+                continue
+
+            if alignment == 'interpolate':
+                row[:] = numpy.interp(grid, dates, data, left=0, right=data[-1])
+            else:
+                # the index of the last entry on or before every grid date
+                previous = numpy.searchsorted(dates, grid, side='right') - 1
+                hasPrevious = previous >= 0
+                row[hasPrevious] = data[previous[hasPrevious]]
+
+        return grid, values
+
     # returns a pandas series
     def getColumnLabels(self) -> typing.List[str]:
         """Return all the column labels
@@ -213,43 +432,50 @@ class GanttDatabase:
     
     """
     def __init__(self, chartJSON: dict):
-        self.type = chartJSON['type']
+        self.type = chartJSON.get('type', 'gantt')
         self.createDatabase(chartJSON)
     
     def createDatabase(self, chartJSON: dict):
         self.title = chartJSON['title']
 
-        self.minStartDate = None
-        self.maxStartDate = None
-        self.minEndDate = None
-        self.maxEndDate = None
-
-        self.dashes = [ ]
+        names, starts, ends, extendTos, columns = [ ], [ ], [ ], [ ], [ ]
         for dashJSON in chartJSON['data']:
-            name = dashJSON['label']
-            start = dashJSON['start']
-            end = dashJSON['end']
+            names.append(dashJSON['label'])
+            starts.append(dashJSON['start'])
+            ends.append(dashJSON['end'])
             extendTo = None
             if 'extendTo' in dashJSON:
                 extendTo = dashJSON['extendTo']
+            extendTos.append(extendTo)
             column = None
             if 'column' in dashJSON:
                 column = dashJSON['column']
+            columns.append(column)
 
-            dash = Dash(name, start, end, extendTo=extendTo, column=column)
+        # convert each date column in one go, rather than date by date
+        self.isDate = isDateColumn(starts)
+        # extendTo is usually missing on the first dash, so the starts decide for every column
+        starts = toPlotDates(starts, self.isDate).tolist()
+        ends = toPlotDates(ends, self.isDate).tolist()
+        extendTos = toPlotDates(extendTos, self.isDate).tolist()
 
-            if self.minStartDate is None or dash.start < self.minStartDate:
-                self.minStartDate = dash.start
-            if self.maxStartDate is  None or self.maxStartDate < dash.start:
-                self.maxStartDate = dash.start
-            if self.minEndDate is None or dash.maxEnd < self.minEndDate:
-                self.minEndDate = dash.maxEnd
-            if self.maxEndDate is None or self.maxEndDate < dash.maxEnd:
-                self.maxEndDate = dash.maxEnd
+        self.dashes = [ ]
+        for name, start, end, extendTo, column in zip(names, starts, ends, extendTos, columns):
+            if math.isnan(extendTo):
+                extendTo = None
+
+            dash = Dash(name, start, end, extendTo=extendTo, column=column)
 
             self.dashes.append(dash)
         self.dashes.sort(key = lambda dash : dash.start)
 
+        # columnar copies of the dates, in the same order as the dashes
+        self.starts = numpy.array([dash.start for dash in self.dashes], dtype=float)
+        self.ends = numpy.array([dash.maxEnd for dash in self.dashes], dtype=float)
+
+        self.minStartDate, self.maxStartDate = dateBounds([self.starts])
+        self.minEndDate, self.maxEndDate = dateBounds([self.ends])
+
         self.minDate = self.minStartDate
         self.maxDate = self.maxEndDate
 
@@ -264,6 +490,39 @@ class GanttDatabase:
         for dash in self.dashes:
             yield dash
 
+    def stackDashes(self) -> typing.List[typing.List[Dash]]:
+        """Compact the dashes into lanes, so there isn't a single row for every dash
+
+        Dashes with a ``column`` are placed in that lane, the rest go in the
+        first lane that is free by the time they start. The lanes are
+        returned bottom to top, so column 0 ends up at the top of the chart.
+
+        :return: The lanes, each a list of dashes in order of start date
+        :rtype: list[list[Dash]]
+        """
+        dashStacks = [ ]
+
+        # simple greedy algorithm for stacking gantt dashes
+        for dash in self.dashes:
+            if dash.column != None: # if a column is specified, place it in that column
+                # if the column doesn't exist, create it by adding empty stacks
+                while len(dashStacks) < dash.column + 1:
+                    dashStacks.append([ ])
+                dashStacks[dash.column].append(dash)
+            else: # otherwise, place it in the first available stack
+                placed = False
+                for stack in dashStacks: # look for the first stack the dash can be placed in
+                    if len(stack) < 1 or stack[len(stack) - 1].maxEnd <= dash.start:
+                        stack.append(dash)
+                        placed = True
+                        break
+                if not placed: # if it still hasn't been placed, create a new stack for it
+                    dashStacks.append([dash])
+
+        dashStacks.reverse() # cosmetic
+
+        return dashStacks
+
     def computeMaxOverlaps(self):
         # copy list of dashes and sort by start property
         starts = self.dashes[:]
@@ -334,28 +593,22 @@ class EventDatabase:
     def __init__(self, chartJSON: dict):
         # because there may be multiple events on the same date, DO NOT take the date column
         # as the index
-        self.type = chartJSON['type']
+        self.type = chartJSON.get('type', 'event')
         self.createDatabase(chartJSON)
     
     def createDatabase(self, chartJSON: dict):
         self.title = chartJSON['title']
 
-        self.minDate = None
-        self.maxDate = None
-
-        self.dates = [ ]
-        self.events = [ ]
+        dates = [ ]
+        briefs = [ ]
         for eventJSON in chartJSON['data']:
-            brief = eventJSON['label']
-            date = eventJSON['date']
-            
-            self.dates.append(date)
-            self.events.append(Event(date, brief))
-
-            if self.minDate is None or date < self.minDate:
-                self.minDate = date
-            if self.maxDate is None or self.maxDate < date:
-                self.maxDate = date
+            briefs.append(eventJSON['label'])
+            dates.append(eventJSON['date'])
+
+        self.isDate = isDateColumn(dates)
+        self.dates = toPlotDates(dates)
+        self.events = [Event(date, brief) for date, brief in zip(self.dates.tolist(), briefs)]
+        self.minDate, self.maxDate = dateBounds([self.dates])
     
     def events(self) -> Event:
         """A generator with returns all the events in the collection
@@ -366,5 +619,227 @@ class EventDatabase:
         for event in self.events:
             yield event
     
+    def layout(self, minSeparation: float, maxLevels: int = None) -> EventLayout:
+        """Assign each event date a label level so that nearby labels don't overlap
+
+        The dates are sorted once and events on the same date are collapsed
+        into one counted marker. Then, from left to right, each date takes
+        the lowest level whose previous label is at least ``minSeparation``
+        away. This is O(n log n) in the number of events.
+
+        :param minSeparation: The closest two labels may be on the same level, in date units.
+            Convert from pixels with the width of the axis
+        :type minSeparation: float
+        :param maxLevels: The most levels to use. A label that would need another level
+            is dropped, and its date is given level 0. No limit if None
+        :type maxLevels: int
+        :return: The marker and label positions
+        :rtype: EventLayout
+        """
+        order = numpy.argsort(self.dates, kind='stable')
+        sortedDates = self.dates[order]
+
+        # the first event of every run of equal dates starts a cluster
+        isFirst = numpy.empty(len(sortedDates), dtype=bool)
+        isFirst[:1] = True
+        numpy.not_equal(sortedDates[1:], sortedDates[:-1], out=isFirst[1:])
+        firsts = numpy.flatnonzero(isFirst)
+        counts = numpy.diff(numpy.append(firsts, len(sortedDates)))
+        clusterDates = sortedDates[firsts]
+
+        labels = [ ]
+        for first, count in zip(order[firsts], counts):
+            brief = self.events[first].brief
+            labels.append(brief if count == 1 else f"{brief} (+{count - 1})")
+
+        # levels that are free to take a label, lowest first
+        freeLevels = [ ]
+        # levels with a label that is still too close, (date they free up, level)
+        busyLevels = [ ]
+        levels = numpy.empty(len(clusterDates), dtype=int)
+        for index, date in enumerate(clusterDates):
+            while len(busyLevels) > 0 and busyLevels[0][0] <= date:
+                heapq.heappush(freeLevels, heapq.heappop(busyLevels)[1])
+
+            if len(freeLevels) > 0:
+                level = heapq.heappop(freeLevels)
+            elif maxLevels is None or len(busyLevels) < maxLevels:
+                level = len(busyLevels) + 1
+            else:
+                # no room for the label, the marker is still drawn and counted
+                levels[index] = 0
+                continue
+
+            levels[index] = level
+            heapq.heappush(busyLevels, (date + minSeparation, level))
+
+        return EventLayout(clusterDates, counts, levels, labels)
+
     def __len__(self):
         return len(self.events)
+
+def buildDatabases(dataFileJSON: dict) -> list:
+    """Construct one database object for every chart in the description
+
+    :param dataFileJSON: The parsed chart description
+    :type dataFileJSON: dict
+    :return: The databases, in the order the charts are listed
+    :rtype: list
+    """
+    databases = [ ]
+    for chart in dataFileJSON['charts']:
+        if chart['type'] == 'gantt':
+            databases.append(GanttDatabase(chart))
+        elif chart['type'] == 'event':
+            databases.append(EventDatabase(chart))
+        elif chart['type'] == 'linear':
+            databases.append(Database(chart))
+        elif chart['type'] == 'area':
+            databases.append(Database(chart))
+    return databases
+
+class TimeDomain:
+    """The date range and ticks shared by every chart in a description
+
+    Worked out once from the databases' date columns, so every axis,
+    including those of area charts, shows the same range.
+
+    When the charts use ISO dates, the range is in days since 1970-01-01
+    (see :func:`toPlotDates`) and the intervals may be calendar intervals
+    like ``10Y`` (see :func:`parseInterval`). A plain number is then a
+    number of days.
+
+    :cvar bool isDate: Whether the charts use ISO dates
+    :cvar float start: The first date shown
+    :cvar float end: The last date shown
+    :cvar majorInterval: The distance between major ticks, or None to let the renderer choose
+    :cvar minorInterval: The distance between minor ticks, or None for no minor ticks
+    """
+    def __init__(self, dataFileJSON: dict, databases: list):
+        self.isDate = any(database.isDate for database in databases)
+
+        # if the chart description does not manually specify a date range, use the min and max dates from the data
+        # otherwise, use the specified range
+        self.start = dataFileJSON.get('start')
+        self.end = dataFileJSON.get('end')
+        if isinstance(self.start, str):
+            self.start = toPlotDates([self.start])[0]
+        if isinstance(self.end, str):
+            self.end = toPlotDates([self.end])[0]
+        if self.start is None or self.end is None:
+            columns = [ ]
+            for database in databases:
+                if database.type == 'gantt':
+                    columns += [database.starts, database.ends]
+                elif database.type == 'event':
+                    columns.append(database.dates)
+                else:
+                    columns += [series.dates for series in database.serieses]
+            minDate, maxDate = dateBounds(columns)
+            if self.start is None:
+                self.start = minDate
+            if self.end is None:
+                self.end = maxDate
+
+        # a single date would give an empty range, widen it the way
+        # matplotlib's set_xlim does
+        if self.start is not None and self.start == self.end:
+            margin = 0.05 * abs(self.start) if self.start != 0 else 0.05
+            self.start -= margin
+            self.end += margin
+
+        self.majorInterval = dataFileJSON.get('majorInterval')
+        self.minorInterval = dataFileJSON.get('minorInterval')
+
+    def span(self) -> float:
+        """The distance between the first and last date shown
+
+        :return: ``end - start``
+        :rtype: float
+        """
+        return self.end - self.start
+
+    def majorTicks(self) -> numpy.ndarray:
+        """The major tick locations within the range
+
+        Uses ``majorInterval`` if it was given, otherwise a round interval
+        that gives about ten ticks.
+
+        :return: The tick dates
+        :rtype: numpy.ndarray
+        """
+        return self.ticks(self.majorTickInterval())
+
+    def majorTickLabels(self) -> typing.List[str]:
+        """The labels for :meth:`majorTicks`
+
+        Dates are written as ISO dates, down to the unit of the interval.
+
+        :return: One label for each major tick
+        :rtype: list[str]
+        """
+        interval = self.majorTickInterval()
+        ticks = self.ticks(interval)
+        if isinstance(interval, str):
+            unit = parseInterval(interval)[1]
+            # show weeks as days, and seconds only if the ticks are that close
+            unit = {'W': 'D', 'h': 'm'}.get(unit, unit)
+            return numpy.datetime_as_string(fromPlotDates(ticks), unit=unit).tolist()
+        if self.isDate:
+            # a plain number of days
+            return numpy.datetime_as_string(fromPlotDates(ticks), unit=dayIntervalUnit(interval)).tolist()
+        return [f"{tick:g}" for tick in ticks]
+
+    def majorTickInterval(self):
+        """``majorInterval``, or a round interval that gives about ten ticks if there is none
+
+        :return: A number, or a calendar interval for ISO dates
+        :rtype: float or str
+        """
+        if self.majorInterval is not None:
+            return self.majorInterval
+        if not self.isDate:
+            return niceInterval(self.span())
+
+        years = self.span() / 365.25
+        if years >= 2:
+            return f"{max(1, int(niceInterval(years)))}Y"
+        for interval, days in CALENDAR_INTERVALS:
+            if self.span() / days <= 10:
+                return interval
+        return '1Y'
+
+    def minorTicks(self) -> numpy.ndarray:
+        """The minor tick locations within the range, empty if there is no ``minorInterval``
+
+        :return: The tick dates
+        :rtype: numpy.ndarray
+        """
+        if self.minorInterval is None:
+            return numpy.empty(0)
+        return self.ticks(self.minorInterval)
+
+    def ticks(self, interval) -> numpy.ndarray:
+        """Every multiple of ``interval`` within the range
+
+        Calendar intervals are counted from 1970, so ``10Y`` ticks fall on
+        decades and ``3M`` ticks on quarters.
+
+        :param interval: The distance between ticks, or a calendar interval for ISO dates
+        :type interval: float or str
+        :return: The tick dates
+        :rtype: numpy.ndarray
+        """
+        if isinstance(interval, str):
+            count, unit = parseInterval(interval)
+            # whole units since 1970, rounded down
+            first = fromPlotDates(self.start).astype(f'datetime64[{unit}]').astype('int64')
+            last = fromPlotDates(self.end).astype(f'datetime64[{unit}]').astype('int64')
+            first -= first % count
+            dates = numpy.arange(first, last + 1, count).astype(f'datetime64[{unit}]')
+            ticks = (dates.astype('datetime64[ms]') - EPOCH).astype(float) / MILLISECONDS_PER_DAY
+            return ticks[(ticks >= self.start) & (ticks <= self.end)]
+
+        first = numpy.ceil(self.start / interval)
+        last = numpy.floor(self.end / interval)
+        return numpy.arange(first, last + 1) * interval
@@ -0,0 +1,285 @@
+import calendar
+import re
+import typing
+
+# Checks a chart description before any of the expensive work starts.
+#
+# Only the standard library is used, so a description can be checked without
+# importing numpy or matplotlib. Everything is checked in a single pass over
+# the description and every problem found is reported, not just the first.
+
+CHART_TYPES = ('gantt', 'event', 'linear', 'area')
+
+# the ISO 8601 dates numpy can parse: a year, optionally followed by the
+# month, day, time and a UTC offset
+ISO_DATE = re.compile(
+    r'(?P<year>[+-]?\d{4,})'
+    r'(?:-(?P<month>\d{2})'
+    r'(?:-(?P<day>\d{2})'
+    r'(?:[T ](?P<hour>\d{2})'
+    r'(?::(?P<minute>\d{2})'
+    r'(?::(?P<second>\d{2}(?:\.\d+)?))?)?'
+    r'(?:Z|[+-]\d{2}:?\d{2})?)?)?)?'
+)
+
+# the largest value each part of an ISO date may take, and the smallest
+ISO_DATE_RANGES = {'month': (1, 12), 'day': (1, 31), 'hour': (0, 23), 'minute': (0, 59), 'second': (0, 59.999)}
+
+INTERVAL = re.compile(r'\s*[1-9]\d*\s*[YMWDhms]\s*')
+
+def isNumber(value) -> bool:
+    """Whether the value is a JSON number. Booleans don't count"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def isISODate(value) -> bool:
+    """Whether the value is an ISO 8601 date that :data:`ISO_DATE` matches and whose parts are in range
+
+    Days are checked against the length of their month, leap years included.
+    """
+    if not isinstance(value, str):
+        return False
+    match = ISO_DATE.fullmatch(value)
+    if match is None:
+        return False
+    for part, (lowest, highest) in ISO_DATE_RANGES.items():
+        if match.group(part) is not None and not lowest <= float(match.group(part)) <= highest:
+            return False
+    if match.group('day') is not None:
+        _, days = calendar.monthrange(int(match.group('year')), int(match.group('month')))
+        if int(match.group('day')) > days:
+            return False
+    return True
+
+def dateKey(value: str) -> typing.Tuple[float, ...]:
+    """A sortable key for an ISO date that :data:`ISO_DATE` matches
+
+    UTC offsets are ignored, which is close enough for spotting dates that
+    are out of order.
+    """
+    match = ISO_DATE.fullmatch(value)
+    return tuple(float(match.group(part) or 0) for part in ('year', 'month', 'day', 'hour', 'minute', 'second'))
+
+class DescriptionChecker:
+    """Collects every problem with a chart description
+
+    Use :func:`validateDescription` rather than this class directly.
+
+    :cvar list[str] errors: One message per problem, prefixed by where it is
+    """
+    def __init__(self):
+        self.errors = [ ]
+        # 'number' or 'ISO date', whichever kind of date was seen first
+        self.dateKind = None
+
+    def error(self, path: str, message: str):
+        self.errors.append(f"{path}: {message}")
+
+    def require(self, container: dict, key: str, path: str, check: typing.Callable, expected: str):
+        """Check that ``container[key]`` exists and passes ``check``
+
+        An explicit null doesn't pass, the renderer would fail on it.
+
+        :return: The value, or None if it is missing or wrong
+        """
+        if key not in container:
+            self.error(path, f"missing '{key}'")
+            return None
+        return self.optional(container, key, path, check, expected)
+
+    def optional(self, container: dict, key: str, path: str, check: typing.Callable, expected: str):
+        """Like :meth:`require`, but a missing key is not a problem. A null still is"""
+        if key not in container:
+            return None
+        value = container[key]
+        if value is None or not check(value):
+            self.error(f"{path}.{key}", f"expected {expected}, got {value!r}")
+            return None
+        return value
+
+    def date(self, container: dict, key: str, path: str, required: bool = True):
+        """Check a date and return a key it can be compared by, or None
+
+        Every date in a description has to be the same kind, either a
+        decimal number or an ISO 8601 string.
+        """
+        if key not in container:
+            if required:
+                self.error(path, f"missing '{key}'")
+            return None
+
+        value = container[key]
+        if isNumber(value):
+            kind = 'number'
+        elif isISODate(value):
+            kind = 'ISO date'
+        else:
+            self.error(f"{path}.{key}", f"expected a number or an ISO 8601 date, got {value!r}")
+            return None
+
+        if self.dateKind is None:
+            self.dateKind = kind
+        elif kind != self.dateKind:
+            self.error(f"{path}.{key}", f"expected a {self.dateKind} like the dates before it, got {value!r}")
+            return None
+
+        return value if kind == 'number' else dateKey(value)
+
+    def interval(self, container: dict, key: str, path: str):
+        """Check a tick interval. Calendar intervals are only allowed with ISO dates,
+        so this has to come after every date has been checked
+        """
+        if self.dateKind == 'ISO date':
+            self.optional(container, key, path,
+                lambda value: (isNumber(value) and value > 0) or (isinstance(value, str) and INTERVAL.fullmatch(value)),
+                "a positive number or a calendar interval like '10Y'")
+        else:
+            self.optional(container, key, path, lambda value: isNumber(value) and value > 0,
+                "a positive number, calendar intervals need ISO dates")
+
+    def checkDescription(self, description):
+        if not isinstance(description, dict):
+            self.error('description', 'expected an object')
+            return
+
+        charts = self.require(description, 'charts', 'description', lambda value: isinstance(value, list), 'a list')
+        if charts is not None and len(charts) == 0:
+            self.error('description.charts', 'expected at least one chart')
+        for index, chart in enumerate(charts or [ ]):
+            self.checkChart(chart, f"charts[{index}]")
+
+        # after the charts, so that their dates decide which kind start and end should be
+        start = self.date(description, 'start', 'description', required=False)
+        end = self.date(description, 'end', 'description', required=False)
+        if start is not None and end is not None and not start < end:
+            self.error('description', f"start ({description['start']!r}) is not before end ({description['end']!r})")
+        self.interval(description, 'majorInterval', 'description')
+        self.interval(description, 'minorInterval', 'description')
+
+    def checkChart(self, chart, path: str):
+        if not isinstance(chart, dict):
+            self.error(path, 'expected an object')
+            return
+
+        chartType = self.require(chart, 'type', path, lambda value: value in CHART_TYPES, f"one of {', '.join(CHART_TYPES)}")
+        self.require(chart, 'title', path, lambda value: isinstance(value, str), 'a string')
+        data = self.require(chart, 'data', path, lambda value: isinstance(value, list), 'a list')
+        if data is None or chartType is None:
+            return
+
+        # a Gantt or event chart without data has no dates to draw its axis from
+        if chartType in ('gantt', 'event') and len(data) == 0:
+            self.error(f"{path}.data", 'expected at least one ' + ('dash' if chartType == 'gantt' else 'event'))
+
+        if chartType == 'gantt':
+            self.checkGantt(data, path)
+        elif chartType == 'event':
+            for index, event in enumerate(data):
+                eventPath = f"{path}.data[{index}]"
+                if not isinstance(event, dict):
+                    self.error(eventPath, 'expected an object')
+                    continue
+                self.require(event, 'label', eventPath, lambda value: isinstance(value, str), 'a string')
+                self.date(event, 'date', eventPath)
+        else:
+            self.checkNumerical(chart, data, path, chartType == 'area')
+
+    def checkGantt(self, data: list, path: str):
+        # (start, end, index) of the dashes pinned to each column
+        pinned = { }
+        for index, dash in enumerate(data):
+            dashPath = f"{path}.data[{index}]"
+            if not isinstance(dash, dict):
+                self.error(dashPath, 'expected an object')
+                continue
+
+            self.require(dash, 'label', dashPath, lambda value: isinstance(value, str), 'a string')
+            start = self.date(dash, 'start', dashPath)
+            end = self.date(dash, 'end', dashPath)
+            extendTo = self.date(dash, 'extendTo', dashPath, required=False)
+            column = self.optional(dash, 'column', dashPath,
+                lambda value: isinstance(value, int) and not isinstance(value, bool) and value >= 0,
+                'a whole number, 0 or more')
+
+            if start is not None and end is not None and not start < end:
+                self.error(dashPath, f"end ({dash['end']!r}) is not after start ({dash['start']!r})")
+            if end is not None and extendTo is not None and extendTo < end:
+                self.error(dashPath, f"extendTo ({dash['extendTo']!r}) is before end ({dash['end']!r})")
+
+            if column is not None and start is not None and end is not None:
+                maxEnd = extendTo if extendTo is not None else end
+                pinned.setdefault(column, [ ]).append((start, maxEnd, index))
+
+        for column, dashes in pinned.items():
+            dashes.sort()
+            # a long dash can overlap several after it, so compare against
+            # the dash that reaches furthest so far, not just the one before
+            _, furthestEnd, furthest = dashes[0]
+            for start, end, index in dashes[1:]:
+                if start < furthestEnd:
+                    self.error(f"{path}.data[{index}]", f"overlaps {path}.data[{furthest}], which is also pinned to column {column}")
+                if end > furthestEnd:
+                    furthestEnd, furthest = end, index
+
+    def checkNumerical(self, chart: dict, data: list, path: str, isArea: bool):
+        for axisName in ('primaryAxis', 'secondaryAxis'):
+            axis = self.optional(chart, axisName, path, lambda value: isinstance(value, dict), 'an object')
+            if axis is None:
+                continue
+            axisPath = f"{path}.{axisName}"
+            minimum = self.require(axis, 'min', axisPath, isNumber, 'a number')
+            maximum = self.require(axis, 'max', axisPath, isNumber, 'a number')
+            self.require(axis, 'interval', axisPath, isNumber, 'a number')
+            if minimum is not None and maximum is not None and not minimum < maximum:
+                self.error(axisPath, f"min ({minimum!r}) is not below max ({maximum!r})")
+
+        if isArea:
+            self.optional(chart, 'alignment', path, lambda value: value in ('interpolate', 'forwardFill'), "'interpolate' or 'forwardFill'")
+
+        if len(data) == 0:
+            self.error(f"{path}.data", 'expected at least one series')
+
+        for index, series in enumerate(data):
+            seriesPath = f"{path}.data[{index}]"
+            if not isinstance(series, dict):
+                self.error(seriesPath, 'expected an object')
+                continue
+
+            self.require(series, 'title', seriesPath, lambda value: isinstance(value, str), 'a string')
+            self.optional(series, 'axis', seriesPath, lambda value: value in ('primary', 'secondary'), "'primary' or 'secondary'")
+            self.optional(series, 'style', seriesPath, lambda value: value in ('default', 'dashed'), "'default' or 'dashed'")
+            entries = self.require(series, 'entries', seriesPath, lambda value: isinstance(value, list), 'a list')
+            if entries is None:
+                continue
+
+            previous = None
+            for entryIndex, entry in enumerate(entries):
+                entryPath = f"{seriesPath}.entries[{entryIndex}]"
+                if not isinstance(entry, dict):
+                    self.error(entryPath, 'expected an object')
+                    continue
+                self.require(entry, 'value', entryPath, isNumber, 'a number')
+                date = self.date(entry, 'date', entryPath)
+
+                # the series are merged onto one grid by date, a series out of order is most likely a mistake
+                if isArea and date is not None:
+                    if previous is not None and not previous < date:
+                        self.error(entryPath, f"date ({entry['date']!r}) does not come after the one before it")
+                    previous = date
+
+def validateDescription(description) -> typing.List[str]:
+    """Check a whole chart description for problems that would stop it rendering
+
+    Checks the types of every field, that required fields are there, that
+    there is at least one chart and every Gantt and event chart has data,
+    that dashes end after they start, that dashes pinned to the same column
+    don't overlap, that area chart dates are in order, and that all dates
+    are the same kind.
+
+    :param description: The parsed chart description
+    :type description: dict
+    :return: A message for every problem found, empty if there are none
+    :rtype: list[str]
+    """
+    checker = DescriptionChecker()
+    checker.checkDescription(description)
+    return checker.errors